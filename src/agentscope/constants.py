@@ -65,3 +65,4 @@ class ShrinkPolicy(IntEnum):
 DEFAULT_CHUNK_SIZE = 1024
 DEFAULT_CHUNK_OVERLAP = 20
 DEFAULT_TOP_K = 5
+DEFAULT_EMBED_BATCH_SIZE = 10
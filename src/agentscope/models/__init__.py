@@ -1,6 +1,9 @@
 # -*- coding: utf-8 -*-
 """ Import modules in models package."""
+import copy
 import json
+import os
+from functools import lru_cache
 from typing import Union, Type
 
 from loguru import logger
@@ -128,6 +131,21 @@ def clear_model_configs() -> None:
     _MODEL_CONFIGS.clear()
 
 
+@lru_cache(maxsize=32)
+def _load_config_file(
+    path: str,
+    mtime_ns: int,
+    size: int,
+) -> Union[dict, list]:
+    """Load a json config file. The result is cached by the file path, its
+    modification time (in ns) and size, so that repeated `agentscope.init`
+    calls (e.g. in notebooks or tests) skip re-parsing an unchanged file."""
+    # mtime_ns and size are only used as part of the cache key
+    del mtime_ns, size
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
 def read_model_configs(
     configs: Union[dict, str, list],
     clear_existing: bool = False,
@@ -151,8 +169,16 @@ def read_model_configs(
     cfgs = None
 
     if isinstance(configs, str):
-        with open(configs, "r", encoding="utf-8") as f:
-            cfgs = json.load(f)
+        # deep copy the cached configs, so that nested dicts (e.g.
+        # generate_args) are not shared across calls
+        stat = os.stat(configs)
+        cfgs = copy.deepcopy(
+            _load_config_file(
+                os.path.abspath(configs),
+                stat.st_mtime_ns,
+                stat.st_size,
+            ),
+        )
 
     if isinstance(configs, dict):
         cfgs = [configs]
@@ -423,6 +423,8 @@ class DashScopeTextEmbeddingWrapper(DashScopeWrapperBase):
 
     model_type: str = "dashscope_text_embedding"
 
+    supports_batch_embedding: bool = True
+
     def _register_default_metrics(self) -> None:
         # Set monitor accordingly
         # TODO: set quota to the following metrics
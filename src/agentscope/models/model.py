@@ -180,6 +180,10 @@ class ModelWrapperBase(metaclass=_ModelWrapperMeta):
     model_name: str
     """The name of the model, which is used in model api calling."""
 
+    supports_batch_embedding: bool = False
+    """Whether the model wrapper accepts a list of texts and returns their
+    embeddings in a single call."""
+
     def __init__(
         self,  # pylint: disable=W0613
         config_name: str,
@@ -447,6 +447,8 @@ class OpenAIEmbeddingWrapper(OpenAIWrapperBase):
 
     model_type: str = "openai_embedding"
 
+    supports_batch_embedding: bool = True
+
     def _register_default_metrics(self) -> None:
         # Set monitor accordingly
         # TODO: set quota to the following metrics
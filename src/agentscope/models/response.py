@@ -1,11 +1,28 @@
 # -*- coding: utf-8 -*-
 """Parser for model response."""
 import json
+from numbers import Number
 from typing import Optional, Sequence, Any
 
 from loguru import logger
 
-from agentscope.utils.tools import _is_json_serializable
+
+def _summarize_embedding(embedding: Optional[Sequence]) -> Any:
+    """Replace the embedding vector(s) by a short description for display,
+    e.g. "<1536-dim vector>", since dumping thousands of floats is slow and
+    unreadable. Both sequences and numpy arrays are supported."""
+    if not hasattr(embedding, "__len__") or len(embedding) == 0:
+        return embedding
+
+    if isinstance(embedding[0], Number):
+        # a single embedding
+        return f"<{len(embedding)}-dim vector>"
+
+    # a list of embeddings
+    return [
+        f"<{len(_)}-dim vector>" if hasattr(_, "__len__") else _
+        for _ in embedding
+    ]
 
 
 class ModelResponse:
@@ -70,16 +87,28 @@ class ModelResponse:
         return super().__setattr__(key, value)
 
     def __str__(self) -> str:
-        if _is_json_serializable(self.raw):
-            raw = self.raw
-        else:
-            raw = str(self.raw)
-
         serialized_fields = {
             "text": self.text,
-            "embedding": self.embedding,
+            "embedding": _summarize_embedding(self.embedding),
             "image_urls": self.image_urls,
             "parsed": self.parsed,
-            "raw": raw,
+            "raw": self.raw,
         }
-        return json.dumps(serialized_fields, indent=4, ensure_ascii=False)
+        # Serialize in a single pass, with the objects that are not json
+        # serializable converted into strings
+        try:
+            return json.dumps(
+                serialized_fields,
+                indent=4,
+                ensure_ascii=False,
+                default=str,
+            )
+        except (TypeError, ValueError):
+            # e.g. non-str keys or circular reference in the raw response
+            serialized_fields["raw"] = str(self.raw)
+            return json.dumps(
+                serialized_fields,
+                indent=4,
+                ensure_ascii=False,
+                default=str,
+            )
@@ -4,55 +4,105 @@ This module is an integration of the Llama index RAG
 into AgentScope package
 """
 
+import asyncio
+import json
 import os.path
-from typing import Any, Optional, List, Union
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Optional, List, Union, TYPE_CHECKING
 from loguru import logger
 
-try:
-    import llama_index
-    from llama_index.core.base.base_retriever import BaseRetriever
-    from llama_index.core.base.embeddings.base import (
-        BaseEmbedding,
-        Embedding,
-    )
-    from llama_index.core.ingestion import IngestionPipeline
-
-    from llama_index.core.bridge.pydantic import PrivateAttr
-    from llama_index.core.node_parser import SentenceSplitter
-    from llama_index.core import (
-        VectorStoreIndex,
-        StorageContext,
-        load_index_from_storage,
-    )
-    from llama_index.core.schema import (
-        Document,
-        TransformComponent,
-    )
-except ImportError:
-    llama_index = None
-    BaseRetriever = None
-    BaseEmbedding = None
-    Embedding = None
-    IngestionPipeline = None
-    SentenceSplitter = None
-    VectorStoreIndex = None
-    StorageContext = None
-    load_index_from_storage = None
-    PrivateAttr = None
-    Document = None
-    TransformComponent = None
-
 from agentscope.file_manager import file_manager
 from agentscope.models import ModelWrapperBase
 from agentscope.constants import (
     DEFAULT_TOP_K,
     DEFAULT_CHUNK_SIZE,
     DEFAULT_CHUNK_OVERLAP,
+    DEFAULT_EMBED_BATCH_SIZE,
 )
 from agentscope.rag.knowledge import Knowledge
 
+if TYPE_CHECKING:
+    from llama_index.core.base.base_retriever import BaseRetriever
+    from llama_index.core.base.embeddings.base import BaseEmbedding
+    from llama_index.core.schema import (
+        Document,
+        TransformComponent,
+    )
+
+_MAX_LOAD_DATA_WORKERS = 8
+"""The maximum number of data_processing configs loaded concurrently."""
+
+# Note: llama-index is imported on first use rather than at module level,
+# as importing it takes a considerable amount of time and memory, which
+# should not be paid by users who never build a knowledge.
+
 
-try:
+def _as_embedding(emb: Any) -> List[float]:
+    """
+    Convert an embedding returned by the model wrapper to a list of floats,
+    without copying it if it is already a list.
+    """
+    if isinstance(emb, list):
+        return emb
+    if hasattr(emb, "tolist"):
+        # e.g. numpy array
+        return emb.tolist()
+    return list(emb)
+
+
+def _quantize_int8(emb: List[float]) -> List[float]:
+    """
+    Quantize an embedding to the 255 levels of int8 with a per-vector scale.
+    The scale itself is dropped, since it does not change the cosine
+    similarity used for retrieval.
+    """
+    scale = max(abs(_) for _ in emb) or 1.0
+    return [float(round(_ / scale * 127)) for _ in emb]
+
+
+@lru_cache(maxsize=None)
+def _get_quantization_class() -> type:
+    """
+    Create the transformation that quantizes the embeddings of nodes. The
+    class is created (and llama-index is imported) only once, on the first
+    call.
+    """
+    from llama_index.core.schema import BaseNode, TransformComponent
+
+    class _Int8QuantizeEmbedding(TransformComponent):
+        """
+        Transformation to quantize the embeddings of nodes into int8 values,
+        which makes the persisted vector store several times smaller. It
+        should be placed after the embedding model in the transformations.
+        """
+
+        def __call__(
+            self,
+            nodes: List[BaseNode],
+            **kwargs: Any,
+        ) -> List[BaseNode]:
+            """Quantize the embeddings of the given nodes in place."""
+            for node in nodes:
+                if node.embedding:
+                    node.embedding = _quantize_int8(node.embedding)
+            return nodes
+
+    return _Int8QuantizeEmbedding
+
+
+@lru_cache(maxsize=None)
+def _get_embedding_model_class() -> type:
+    """
+    Create the class that wraps a ModelWrapperBase into an embedding model
+    of llama-index. The class is created (and llama-index is imported) only
+    once, on the first call.
+    """
+    from llama_index.core.base.embeddings.base import (
+        BaseEmbedding,
+        Embedding,
+    )
+    from llama_index.core.bridge.pydantic import PrivateAttr
 
     class _EmbeddingModel(BaseEmbedding):
         """
@@ -61,11 +111,12 @@ try:
         """
 
         _emb_model_wrapper: ModelWrapperBase = PrivateAttr()
+        _executor: ThreadPoolExecutor = PrivateAttr()
 
         def __init__(
             self,
             emb_model: ModelWrapperBase,
-            embed_batch_size: int = 1,
+            embed_batch_size: int = DEFAULT_EMBED_BATCH_SIZE,
         ) -> None:
             """
             Dummy wrapper to convert a ModelWrapperBase to llama Index
@@ -75,13 +126,43 @@ try:
                 emb_model (ModelWrapperBase):
                     embedding model in ModelWrapperBase
                 embed_batch_size (int):
-                    batch size, defaults to 1
+                    batch size, defaults to DEFAULT_EMBED_BATCH_SIZE
             """
+            if not isinstance(embed_batch_size, int) or embed_batch_size < 1:
+                raise ValueError(
+                    "embed_batch_size should be a positive integer, "
+                    f"but got {embed_batch_size}.",
+                )
             super().__init__(
                 model_name="Temporary_embedding_wrapper",
                 embed_batch_size=embed_batch_size,
             )
             self._emb_model_wrapper = emb_model
+            # the model wrappers only provide blocking calls, so the async
+            # methods run them in this pool, which also bounds the number
+            # of concurrent requests sent to the model API
+            self._executor = ThreadPoolExecutor(max_workers=embed_batch_size)
+
+        def __del__(self) -> None:
+            """Release the threads of the pool."""
+            executor = getattr(self, "_executor", None)
+            if executor is not None:
+                executor.shutdown(wait=False)
+
+        def _supports_batch(self) -> bool:
+            """
+            Whether the wrapped model accepts a list of texts in one call
+            """
+            return getattr(
+                self._emb_model_wrapper,
+                "supports_batch_embedding",
+                False,
+            )
+
+        async def _run_in_executor(self, func: Any, *args: Any) -> Any:
+            """Run a blocking embedding call in the thread pool."""
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
 
         def _get_query_embedding(self, query: str) -> List[float]:
             """
@@ -91,7 +172,7 @@ try:
             """
             # Note: AgentScope embedding model wrapper returns list
             # of embedding
-            return list(self._emb_model_wrapper(query).embedding[0])
+            return _as_embedding(self._emb_model_wrapper(query).embedding[0])
 
         def _get_text_embeddings(self, texts: List[str]) -> List[Embedding]:
             """
@@ -99,10 +180,18 @@ try:
             Args:
                  texts ( List[str]): texts to be embedded
             """
-            results = [
-                list(self._emb_model_wrapper(t).embedding[0]) for t in texts
-            ]
-            return results
+            # Note: wrappers that support batch embedding (e.g. OpenAI and
+            # DashScope) embed the whole batch in a single call
+            if self._supports_batch():
+                embeddings = self._emb_model_wrapper(texts).embedding
+                if len(embeddings) == len(texts):
+                    return [_as_embedding(emb) for emb in embeddings]
+                # fall back to serial calls, since this method may itself
+                # be running in the pool (see _aget_text_embeddings)
+                return [self._get_text_embedding(t) for t in texts]
+            # otherwise, the per-text calls are run concurrently in the pool,
+            # e.g. when the sync ingestion pipeline embeds a batch of nodes
+            return list(self._executor.map(self._get_text_embedding, texts))
 
         def _get_text_embedding(self, text: str) -> Embedding:
             """
@@ -110,34 +199,39 @@ try:
             Args:
                  text (str): texts to be embedded
             """
-            return list(self._emb_model_wrapper(text).embedding[0])
+            return _as_embedding(self._emb_model_wrapper(text).embedding[0])
 
-        # TODO: use proper async methods, but depends on model wrapper
         async def _aget_query_embedding(self, query: str) -> List[float]:
             """The asynchronous version of _get_query_embedding."""
-            return self._get_query_embedding(query)
+            return await self._run_in_executor(
+                self._get_query_embedding,
+                query,
+            )
 
         async def _aget_text_embedding(self, text: str) -> List[float]:
             """Asynchronously get text embedding."""
-            return self._get_text_embedding(text)
+            return await self._run_in_executor(
+                self._get_text_embedding,
+                text,
+            )
 
         async def _aget_text_embeddings(
             self,
             texts: List[str],
         ) -> List[List[float]]:
-            """Asynchronously get text embeddings."""
-            return self._get_text_embeddings(texts)
-
-except Exception:
-
-    class _EmbeddingModel:  # type: ignore[no-redef]
-        """
-        A dummy embedding model for passing tests when
-        llama-index is not install
-        """
+            """Asynchronously get text embeddings. If the wrapped model
+            cannot embed a batch in one call, the texts are embedded
+            concurrently."""
+            if self._supports_batch():
+                return await self._run_in_executor(
+                    self._get_text_embeddings,
+                    texts,
+                )
+            return await asyncio.gather(
+                *(self._aget_text_embedding(t) for t in texts),
+            )
 
-        def __init__(self, emb_model: ModelWrapperBase):
-            self._emb_model_wrapper = emb_model
+    return _EmbeddingModel
 
 
 class LlamaIndexKnowledge(Knowledge):
@@ -148,7 +242,7 @@ class LlamaIndexKnowledge(Knowledge):
     def __init__(
         self,
         knowledge_id: str,
-        emb_model: Union[ModelWrapperBase, BaseEmbedding, None] = None,
+        emb_model: Union[ModelWrapperBase, "BaseEmbedding", None] = None,
         knowledge_config: Optional[dict] = None,
         model: Optional[ModelWrapperBase] = None,
         persist_root: Optional[str] = None,
@@ -195,12 +289,14 @@ class LlamaIndexKnowledge(Knowledge):
             model=model,
             **kwargs,
         )
-        if llama_index is None:
+        try:
+            from llama_index.core.base.embeddings.base import BaseEmbedding
+        except ImportError as exc_inner:
             raise ImportError(
                 "LlamaIndexKnowledge require llama-index installed. "
                 "Try a stable llama-index version, such as "
                 "`pip install llama-index==0.10.30`",
-            )
+            ) from exc_inner
 
         if persist_root is None:
             persist_root = file_manager.dir
@@ -211,7 +307,13 @@ class LlamaIndexKnowledge(Knowledge):
         self.index = None
         # ensure the emb_model is compatible with LlamaIndex
         if isinstance(emb_model, ModelWrapperBase):
-            self.emb_model = _EmbeddingModel(emb_model)
+            self.emb_model = _get_embedding_model_class()(
+                emb_model,
+                embed_batch_size=self.knowledge_config.get(
+                    "embed_batch_size",
+                    DEFAULT_EMBED_BATCH_SIZE,
+                ),
+            )
         elif isinstance(self.emb_model, BaseEmbedding):
             pass
         else:
@@ -224,7 +326,7 @@ class LlamaIndexKnowledge(Knowledge):
     def _init_rag(self, **kwargs: Any) -> None:
         """
         Initialize the RAG. This includes:
-            * if the persist_dir exists, load the persisted index
+            * if an index is persisted in persist_dir, load it
             * if not, convert the data to index
             * if needed, update the index
             * set the retriever to retrieve information from index
@@ -236,7 +338,16 @@ class LlamaIndexKnowledge(Knowledge):
                 by calling rag.refresh_index() during the execution of the
                 agent.
         """
-        if os.path.exists(self.persist_dir):
+        from llama_index.core.storage.docstore.types import (
+            DEFAULT_PERSIST_FNAME,
+        )
+
+        # check the docstore file rather than the directory, so that an
+        # empty or partially written persist_dir leads to re-indexing
+        # instead of a failure while loading
+        if os.path.isfile(
+            os.path.join(self.persist_dir, DEFAULT_PERSIST_FNAME),
+        ):
             self._load_index()
             # self.refresh_index()
         else:
@@ -251,6 +362,11 @@ class LlamaIndexKnowledge(Knowledge):
         """
         Load the persisted index from persist_dir.
         """
+        from llama_index.core import (
+            StorageContext,
+            load_index_from_storage,
+        )
+
         # load the storage_context
         storage_context = StorageContext.from_defaults(
             persist_dir=self.persist_dir,
@@ -274,19 +390,48 @@ class LlamaIndexKnowledge(Knowledge):
             As each selected file type may need to use a different loader
             and transformations, knowledge_config is a list of configs.
         """
+        from llama_index.core import VectorStoreIndex
+
+        # load data to documents using information in knowledge_config,
+        # grouping the documents whose configs share the same
+        # store_and_index setting, so that each group is processed by a
+        # single ingestion pipeline
+        configs = self.knowledge_config.get("data_processing")
+        # loading is mostly I/O bound, so the data of different configs
+        # is loaded concurrently
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(len(configs), _MAX_LOAD_DATA_WORKERS)),
+        ) as executor:
+            docs_list = list(
+                executor.map(
+                    lambda config: self._data_to_docs(config=config),
+                    configs,
+                ),
+            )
+
+        doc_groups = {}
+        for config, documents in zip(configs, docs_list):
+            key = json.dumps(
+                config.get("store_and_index"),
+                sort_keys=True,
+                default=str,
+            )
+            if key not in doc_groups:
+                doc_groups[key] = (config, [])
+            doc_groups[key][1].extend(documents)
+
         nodes = []
-        # load data to documents and set transformations
-        # using information in knowledge_config
-        for config in self.knowledge_config.get("data_processing"):
-            documents = self._data_to_docs(config=config)
+        # set transformations and convert documents to nodes for each group
+        for config, documents in doc_groups.values():
             transformations = self._set_transformations(config=config).get(
                 "transformations",
             )
-            nodes_docs = self._docs_to_nodes(
-                documents=documents,
-                transformations=transformations,
+            nodes.extend(
+                self._docs_to_nodes(
+                    documents=documents,
+                    transformations=transformations,
+                ),
             )
-            nodes = nodes + nodes_docs
         # convert nodes to index
         self.index = VectorStoreIndex(
             nodes=nodes,
@@ -334,8 +479,8 @@ class LlamaIndexKnowledge(Knowledge):
 
     def _docs_to_nodes(
         self,
-        documents: List[Document],
-        transformations: Optional[list[Optional[TransformComponent]]] = None,
+        documents: List["Document"],
+        transformations: Optional[list[Optional["TransformComponent"]]] = None,
     ) -> Any:
         """
         Convert the loaded documents to nodes using transformations.
@@ -351,6 +496,8 @@ class LlamaIndexKnowledge(Knowledge):
         Return:
             Any: return the index of the processed document
         """
+        from llama_index.core.ingestion import IngestionPipeline
+
         # nodes, or called chunks, is a presentation of the documents
         # we build nodes by using the IngestionPipeline
         # for each document with corresponding transformations
@@ -407,6 +554,8 @@ class LlamaIndexKnowledge(Knowledge):
             )
             transformations = temp.get("transformations")
         else:
+            from llama_index.core.node_parser import SentenceSplitter
+
             transformations = [
                 SentenceSplitter(
                     chunk_size=self.knowledge_config.get(
@@ -422,6 +571,10 @@ class LlamaIndexKnowledge(Knowledge):
         # adding embedding model as the last step of transformation
         # https://docs.llamaindex.ai/en/stable/module_guides/loading/ingestion_pipeline/root.html
         transformations.append(self.emb_model)
+        # optionally quantize the embeddings to reduce the size of the index,
+        # which relies on the (default) cosine similarity for retrieval
+        if self.knowledge_config.get("quantize_embeddings", False):
+            transformations.append(_get_quantization_class()())
         logger.info("transformations are ready.")
         # as the last step, we need to repackage the transformations in dict
         transformations = {"transformations": transformations}
@@ -431,7 +584,7 @@ class LlamaIndexKnowledge(Knowledge):
         self,
         similarity_top_k: int = None,
         **kwargs: Any,
-    ) -> BaseRetriever:
+    ) -> "BaseRetriever":
         """
         Set the retriever as needed, or just use the default setting.
 
@@ -458,7 +611,7 @@ class LlamaIndexKnowledge(Knowledge):
         query: str,
         similarity_top_k: int = None,
         to_list_strs: bool = False,
-        retriever: Optional[BaseRetriever] = None,
+        retriever: Optional["BaseRetriever"] = None,
         **kwargs: Any,
     ) -> list[Any]:
         """
@@ -509,8 +662,8 @@ class LlamaIndexKnowledge(Knowledge):
 
     def _insert_docs_to_index(
         self,
-        documents: List[Document],
-        transformations: TransformComponent,
+        documents: List["Document"],
+        transformations: "TransformComponent",
     ) -> None:
         """
         Add documents to the index. Given a list of documents, we first test if
@@ -525,6 +678,8 @@ class LlamaIndexKnowledge(Knowledge):
             transformations (TransformComponent): transformations that
             convert the documents into nodes.
         """
+        from llama_index.core.ingestion import IngestionPipeline
+
         # this is the pipline that generate the nodes
         pipeline = IngestionPipeline(
             transformations=transformations,
@@ -565,7 +720,7 @@ class LlamaIndexKnowledge(Knowledge):
 
     def _delete_docs_from_index(
         self,
-        documents: List[Document],
+        documents: List["Document"],
     ) -> None:
         """
         Delete the nodes that are associated with a list of documents.
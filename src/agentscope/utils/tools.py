@@ -252,15 +252,6 @@ def generate_id_from_seed(seed: str, length: int = 8) -> str:
     return "".join(id_chars)
 
 
-def _is_json_serializable(obj: Any) -> bool:
-    """Check if the given object is json serializable."""
-    try:
-        json.dumps(obj)
-        return True
-    except TypeError:
-        return False
-
-
 def _convert_to_str(content: Any) -> str:
     """Convert the content to string.
 
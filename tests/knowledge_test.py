@@ -3,13 +3,21 @@
 Unit tests for knowledge (RAG module in AgentScope)
 """
 
+import asyncio
 import os
+import threading
+import time
 import unittest
 from typing import Any
+from unittest.mock import patch
 import shutil
 
 from agentscope.rag import LlamaIndexKnowledge
-from agentscope.models import OpenAIEmbeddingWrapper, ModelResponse
+from agentscope.models import (
+    ModelWrapperBase,
+    OpenAIEmbeddingWrapper,
+    ModelResponse,
+)
 
 
 class DummyModel(OpenAIEmbeddingWrapper):
@@ -25,6 +33,63 @@ class DummyModel(OpenAIEmbeddingWrapper):
         return ModelResponse(embedding=[[1.0, 2.0]])
 
 
+class DummyBatchModel(ModelWrapperBase):
+    """
+    Dummy model wrapper that embeds a list of texts in one call
+    """
+
+    model_type: str = "dummy_batch_embedding"
+
+    supports_batch_embedding: bool = True
+
+    def __init__(self) -> None:
+        """dummy init"""
+        self.call_count = 0
+
+    def __call__(self, *args: Any, **kwargs: Any) -> ModelResponse:
+        """dummy call"""
+        self.call_count += 1
+        texts = args[0]
+        if isinstance(texts, str):
+            texts = [texts]
+        return ModelResponse(
+            embedding=[[float(len(t)), 1.0] for t in texts],
+        )
+
+    def format(self, *args: Any) -> str:
+        """dummy format"""
+        return ""
+
+
+class DummyPerTextModel(ModelWrapperBase):
+    """
+    Dummy model wrapper that embeds a single text per call, and records
+    the maximum number of concurrent calls
+    """
+
+    model_type: str = "dummy_per_text_embedding"
+
+    def __init__(self) -> None:
+        """dummy init"""
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, *args: Any, **kwargs: Any) -> ModelResponse:
+        """dummy call"""
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.1)
+        with self.lock:
+            self.active -= 1
+        return ModelResponse(embedding=[[float(len(args[0])), 1.0]])
+
+    def format(self, *args: Any) -> str:
+        """dummy format"""
+        return ""
+
+
 class KnowledgeTest(unittest.TestCase):
     """
     Test cases for TemporaryMemory
@@ -88,6 +153,239 @@ class KnowledgeTest(unittest.TestCase):
             [self.content],
         )
 
+    def test_group_data_processing(self) -> None:
+        """test that documents sharing store_and_index settings are
+        converted to nodes together"""
+        file_name_2 = os.path.join(self.data_dir, "file2.txt")
+        with open(file_name_2, "w", encoding="utf-8") as f:
+            f.write("another file")
+
+        def _config(file_name: str, chunk_size: int = None) -> dict:
+            config = {
+                "load_data": {
+                    "loader": {
+                        "create_object": True,
+                        "module": "llama_index.core",
+                        "class": "SimpleDirectoryReader",
+                        "init_args": {"input_files": [file_name]},
+                    },
+                },
+            }
+            if chunk_size is not None:
+                config["store_and_index"] = {
+                    "transformations": [
+                        {
+                            "create_object": True,
+                            "module": "llama_index.core.node_parser",
+                            "class": "SentenceSplitter",
+                            "init_args": {"chunk_size": chunk_size},
+                        },
+                    ],
+                }
+            return config
+
+        docs_to_nodes = (
+            LlamaIndexKnowledge._docs_to_nodes  # pylint: disable=W0212
+        )
+
+        # configs without store_and_index share the default transformations
+        with patch.object(
+            LlamaIndexKnowledge,
+            "_docs_to_nodes",
+            autospec=True,
+            side_effect=docs_to_nodes,
+        ) as mock_docs_to_nodes:
+            LlamaIndexKnowledge(
+                knowledge_id="test_group_knowledge",
+                emb_model=DummyModel(),
+                knowledge_config={
+                    "data_processing": [
+                        _config(self.file_name_1),
+                        _config(file_name_2),
+                    ],
+                },
+            )
+        self.assertEqual(mock_docs_to_nodes.call_count, 1)
+        self.assertEqual(
+            len(mock_docs_to_nodes.call_args.kwargs["documents"]),
+            2,
+        )
+
+        # configs with different store_and_index settings stay separate
+        with patch.object(
+            LlamaIndexKnowledge,
+            "_docs_to_nodes",
+            autospec=True,
+            side_effect=docs_to_nodes,
+        ) as mock_docs_to_nodes:
+            LlamaIndexKnowledge(
+                knowledge_id="test_separate_knowledge",
+                emb_model=DummyModel(),
+                knowledge_config={
+                    "data_processing": [
+                        _config(self.file_name_1, chunk_size=300),
+                        _config(file_name_2, chunk_size=400),
+                    ],
+                },
+            )
+        self.assertEqual(mock_docs_to_nodes.call_count, 2)
+
+    def test_empty_persist_dir(self) -> None:
+        """test that an empty persist dir does not prevent indexing"""
+        persist_root = os.path.join(self.data_dir, "persist")
+        os.makedirs(os.path.join(persist_root, "test_knowledge"))
+
+        knowledge = LlamaIndexKnowledge(
+            knowledge_id="test_knowledge",
+            emb_model=DummyModel(),
+            knowledge_config={
+                "data_processing": [
+                    {
+                        "load_data": {
+                            "loader": {
+                                "create_object": True,
+                                "module": "llama_index.core",
+                                "class": "SimpleDirectoryReader",
+                                "init_args": {
+                                    "input_files": [self.file_name_1],
+                                },
+                            },
+                        },
+                    },
+                ],
+            },
+            persist_root=persist_root,
+        )
+        retrieved = knowledge.retrieve(query="testing", to_list_strs=True)
+        self.assertEqual(retrieved, [self.content])
+
+    def test_quantize_embeddings(self) -> None:
+        """test indexing with int8 quantized embeddings"""
+        dummy_model = DummyBatchModel()
+
+        knowledge = LlamaIndexKnowledge(
+            knowledge_id="test_quantized_knowledge",
+            emb_model=dummy_model,
+            knowledge_config={
+                "quantize_embeddings": True,
+                "data_processing": [
+                    {
+                        "load_data": {
+                            "loader": {
+                                "create_object": True,
+                                "module": "llama_index.core",
+                                "class": "SimpleDirectoryReader",
+                                "init_args": {
+                                    "input_files": [self.file_name_1],
+                                },
+                            },
+                        },
+                    },
+                ],
+            },
+        )
+        embeddings = list(
+            knowledge.index.vector_store.data.embedding_dict.values(),
+        )
+        self.assertEqual(len(embeddings), 1)
+        # the largest component is scaled to 127, others rounded to int8
+        self.assertEqual(embeddings[0][0], 127.0)
+        self.assertTrue(all(float(int(_)) == _ for _ in embeddings[0]))
+        retrieved = knowledge.retrieve(query="testing", to_list_strs=True)
+        self.assertEqual(retrieved, [self.content])
+
+    def test_batch_embedding(self) -> None:
+        """test embedding a batch of texts with a single model call"""
+        dummy_model = DummyBatchModel()
+
+        knowledge = LlamaIndexKnowledge(
+            knowledge_id="test_batch_knowledge",
+            emb_model=dummy_model,
+            knowledge_config={"data_processing": []},
+        )
+        embeddings = knowledge.emb_model.get_text_embedding_batch(
+            ["a", "bb", "ccc"],
+        )
+        self.assertEqual(
+            embeddings,
+            [[1.0, 1.0], [2.0, 1.0], [3.0, 1.0]],
+        )
+        self.assertEqual(dummy_model.call_count, 1)
+
+        embeddings = asyncio.run(
+            knowledge.emb_model.aget_text_embedding_batch(["a", "bb"]),
+        )
+        self.assertEqual(embeddings, [[1.0, 1.0], [2.0, 1.0]])
+        self.assertEqual(dummy_model.call_count, 2)
+
+    def test_per_text_embedding_in_ingestion(self) -> None:
+        """test that the ingestion pipeline embeds nodes concurrently with
+        a model that cannot batch"""
+        dummy_model = DummyPerTextModel()
+        file_name_2 = os.path.join(self.data_dir, "file2.txt")
+        with open(file_name_2, "w", encoding="utf-8") as f:
+            f.write("another file")
+
+        LlamaIndexKnowledge(
+            knowledge_id="test_ingestion_knowledge",
+            emb_model=dummy_model,
+            knowledge_config={
+                "embed_batch_size": 2,
+                "data_processing": [
+                    {
+                        "load_data": {
+                            "loader": {
+                                "create_object": True,
+                                "module": "llama_index.core",
+                                "class": "SimpleDirectoryReader",
+                                "init_args": {
+                                    "input_files": [
+                                        self.file_name_1,
+                                        file_name_2,
+                                    ],
+                                },
+                            },
+                        },
+                    },
+                ],
+            },
+        )
+        self.assertEqual(dummy_model.max_active, 2)
+
+    def test_async_per_text_embedding(self) -> None:
+        """test concurrent embedding with a model that cannot batch"""
+        dummy_model = DummyPerTextModel()
+
+        knowledge = LlamaIndexKnowledge(
+            knowledge_id="test_async_knowledge",
+            emb_model=dummy_model,
+            knowledge_config={
+                "embed_batch_size": 2,
+                "data_processing": [],
+            },
+        )
+        texts = ["a" * i for i in range(1, 7)]
+        embeddings = asyncio.run(
+            knowledge.emb_model.aget_text_embedding_batch(texts),
+        )
+        # the order of the texts is kept
+        self.assertEqual(
+            embeddings,
+            [[float(i), 1.0] for i in range(1, 7)],
+        )
+        # the calls overlap, but stay within embed_batch_size
+        self.assertEqual(dummy_model.max_active, 2)
+
+        with self.assertRaises(ValueError):
+            LlamaIndexKnowledge(
+                knowledge_id="test_async_knowledge",
+                emb_model=dummy_model,
+                knowledge_config={
+                    "embed_batch_size": 0,
+                    "data_processing": [],
+                },
+            )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -4,9 +4,15 @@ Unit tests for model wrapper classes and functions
 """
 
 from typing import Any, Union, List, Sequence
+import json
+import os
+import tempfile
 import unittest
 from unittest.mock import patch, MagicMock
 
+import numpy as np
+
+from agentscope import models
 from agentscope.message import MessageBase
 from agentscope.models import (
     ModelResponse,
@@ -114,3 +120,115 @@ class BasicModelTest(unittest.TestCase):
             load_model_by_config_name,
             "test_model_wrapper",
         )
+
+    def test_load_model_configs_from_file(self) -> None:
+        """Test that model config files are cached by path, mtime and
+        size"""
+        configs = [
+            {
+                "model_type": "post_api_chat",
+                "config_name": "my_post_api",
+                "api_url": "https://xxx",
+                "generate_args": {"temperature": 0.5},
+            },
+        ]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "model_configs.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(configs, f)
+
+            with patch(
+                "agentscope.models.json.load",
+                wraps=json.load,
+            ) as mock_load:
+                read_model_configs(configs=path, clear_existing=True)
+                # mutating the loaded config should not affect the cache
+                cfg = models._MODEL_CONFIGS[  # pylint: disable=W0212
+                    "my_post_api"
+                ]
+                cfg["generate_args"]["temperature"] = 1.0
+
+                # a cache hit skips re-parsing
+                read_model_configs(configs=path, clear_existing=True)
+                self.assertEqual(mock_load.call_count, 1)
+                cfg = models._MODEL_CONFIGS[  # pylint: disable=W0212
+                    "my_post_api"
+                ]
+                self.assertEqual(cfg["generate_args"]["temperature"], 0.5)
+
+                # a changed mtime reloads the file
+                configs[0]["generate_args"]["temperature"] = 0.8
+                with open(path, "w", encoding="utf-8") as f:
+                    json.dump(configs, f)
+                stat = os.stat(path)
+                os.utime(
+                    path,
+                    ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**10),
+                )
+                read_model_configs(configs=path, clear_existing=True)
+                self.assertEqual(mock_load.call_count, 2)
+                cfg = models._MODEL_CONFIGS[  # pylint: disable=W0212
+                    "my_post_api"
+                ]
+                self.assertEqual(cfg["generate_args"]["temperature"], 0.8)
+
+                # a file rewritten with the same mtime (e.g. within the
+                # same second on coarse filesystems) is reloaded if its
+                # size changed
+                stat = os.stat(path)
+                configs[0]["generate_args"]["temperature"] = 0.75
+                with open(path, "w", encoding="utf-8") as f:
+                    json.dump(configs, f)
+                os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+                read_model_configs(configs=path, clear_existing=True)
+                self.assertEqual(mock_load.call_count, 3)
+                cfg = models._MODEL_CONFIGS[  # pylint: disable=W0212
+                    "my_post_api"
+                ]
+                self.assertEqual(cfg["generate_args"]["temperature"], 0.75)
+        clear_model_configs()
+
+    def test_response_str(self) -> None:
+        """Test the string representation of model response"""
+        response = ModelResponse(
+            text="hi",
+            embedding=[[0.1] * 1536, [0.2] * 1536],
+        )
+        fields = json.loads(str(response))
+        self.assertEqual(fields["text"], "hi")
+        self.assertEqual(
+            fields["embedding"],
+            ["<1536-dim vector>", "<1536-dim vector>"],
+        )
+
+        # numpy arrays, as a list of embeddings or a single embedding
+        response = ModelResponse(embedding=[np.arange(5.0), np.arange(5.0)])
+        fields = json.loads(str(response))
+        self.assertEqual(
+            fields["embedding"],
+            ["<5-dim vector>", "<5-dim vector>"],
+        )
+        response = ModelResponse(embedding=np.arange(5.0))
+        fields = json.loads(str(response))
+        self.assertEqual(fields["embedding"], "<5-dim vector>")
+        response = ModelResponse(embedding=np.zeros((2, 3)))
+        fields = json.loads(str(response))
+        self.assertEqual(
+            fields["embedding"],
+            ["<3-dim vector>", "<3-dim vector>"],
+        )
+
+        # raw values that are not json serializable
+        class _Unserializable:
+            def __str__(self) -> str:
+                return "unserializable"
+
+        response = ModelResponse(text="x", raw={"a": _Unserializable()})
+        fields = json.loads(str(response))
+        self.assertEqual(fields["raw"], {"a": "unserializable"})
+
+        raw = {(1, 2): "a"}
+        response = ModelResponse(text="x", raw=raw)
+        fields = json.loads(str(response))
+        self.assertEqual(fields["text"], "x")
+        self.assertEqual(fields["raw"], str(raw))